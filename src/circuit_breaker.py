@@ -0,0 +1,87 @@
+import logging
+import time
+from types import TracebackType
+
+from src.enums import CircuitBreakerStateEnum
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Request rejected because circuit is open."""
+
+    def __init__(self):
+        super().__init__("Service unavailable, circuit is open")
+
+
+class CircuitBreaker:
+    """Fail fast when server keeps failing.
+
+    After `failure_threshold` failures in a row the circuit opens and
+    requests are rejected for `recovery_timeout` seconds. Then up to
+    `half_open_max_calls` trial requests are let through: success closes
+    the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_exceptions: tuple[type[BaseException], ...],
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30,
+        half_open_max_calls: int = 1,
+    ):
+        """Init circuit breaker"""
+        self.failure_exceptions = failure_exceptions
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitBreakerStateEnum.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    async def __aenter__(self) -> "CircuitBreaker":
+        """Check that request is allowed."""
+        if self.state == CircuitBreakerStateEnum.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError()
+            logger.info("Circuit is half-open, trying request...")
+            self.state = CircuitBreakerStateEnum.HALF_OPEN
+            self._half_open_calls = 0
+        if self.state == CircuitBreakerStateEnum.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                raise CircuitOpenError()
+            self._half_open_calls += 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Record request result."""
+        if exc_type is None:
+            self._close()
+        elif issubclass(exc_type, self.failure_exceptions):
+            self._record_failure()
+        elif self.state == CircuitBreakerStateEnum.HALF_OPEN:
+            # Unrelated error, free trial slot
+            self._half_open_calls -= 1
+
+    def _close(self) -> None:
+        """Close circuit after successful request."""
+        if self.state != CircuitBreakerStateEnum.CLOSED:
+            logger.info("Circuit is closed")
+        self.state = CircuitBreakerStateEnum.CLOSED
+        self._failures = 0
+
+    def _record_failure(self) -> None:
+        """Count failure and open circuit if needed."""
+        self._failures += 1
+        # Failed trial request opens circuit again right away
+        trial_failed = self.state == CircuitBreakerStateEnum.HALF_OPEN
+        if trial_failed or self._failures >= self.failure_threshold:
+            logger.warning(f"Circuit is open for {self.recovery_timeout}s")
+            self.state = CircuitBreakerStateEnum.OPEN
+            self._opened_at = time.monotonic()
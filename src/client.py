@@ -1,14 +1,78 @@
 import asyncio
 import logging
-from typing import Any
+import random
+import threading
+from typing import Any, Awaitable, Callable
 
-from aiohttp import ClientSession
-from aiohttp.client_exceptions import ClientConnectorError, ServerTimeoutError
+import orjson
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp.client_exceptions import (
+    ClientConnectionError,
+    ClientConnectorError,
+    ClientError,
+    ServerConnectionError,
+    ServerTimeoutError,
+)
 
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError
 from src.enums import ClientCommandEnum
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
+# Connection was not established, the request never reached the server
+RETRYABLE_ERRORS = (ClientConnectorError,)
+# Server dropped connection or read timed out, request may be already handled
+IDEMPOTENT_RETRYABLE_ERRORS = (ServerConnectionError,)
+IDEMPOTENT_METHODS = frozenset({"GET"})
+# Server is unreachable or unhealthy
+FAILURE_ERRORS = (ClientConnectionError, asyncio.TimeoutError)
+REQUEST_ERRORS = (ClientError, asyncio.TimeoutError)
+ALLOWED_COMMANDS = ", ".join(ClientCommandEnum.get_cli_commands())
+
+
+def _is_retryable(error: ClientConnectionError, method: str) -> bool:
+    """Check if failed request can be sent again without side effects."""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    # aiohttp raises connect timeout from asyncio.TimeoutError, nothing was sent
+    if isinstance(error, ServerTimeoutError):
+        if isinstance(error.__cause__, asyncio.TimeoutError):
+            return True
+    is_idempotent = method in IDEMPOTENT_METHODS
+    return is_idempotent and isinstance(error, IDEMPOTENT_RETRYABLE_ERRORS)
+
+
+async def _ainput(prompt: str = "") -> str:
+    """Read line from stdin without blocking event loop.
+
+    input() runs in a daemon thread, not in the default executor, so
+    Ctrl-C exits without waiting for a blocked read to finish.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[str] = loop.create_future()
+
+    def read_line() -> None:
+        try:
+            line = input(prompt)
+        except EOFError as e:
+            loop.call_soon_threadsafe(_set_future_exception, future, e)
+        else:
+            loop.call_soon_threadsafe(_set_future_result, future, line)
+
+    threading.Thread(target=read_line, daemon=True).start()
+    return await future
+
+
+def _set_future_result(future: asyncio.Future, result: str) -> None:
+    """Resolve future unless it was cancelled while waiting for input."""
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_future_exception(future: asyncio.Future, error: BaseException) -> None:
+    """Fail future unless it was cancelled while waiting for input."""
+    if not future.done():
+        future.set_exception(error)
 
 
 class Client:
@@ -19,142 +83,217 @@ class Client:
         user_data: dict[str, Any],
         server_host: str | None = settings.SERVER_HOST,
         server_port: int = settings.SERVER_PORT,
+        request_timeout: int = settings.CLIENT_REQUEST_TIMEOUT,
+        connect_timeout: float = settings.CLIENT_CONNECT_TIMEOUT,
+        read_timeout: float = settings.CLIENT_READ_TIMEOUT,
+        connections_limit: int = settings.CLIENT_CONNECTIONS_LIMIT,
+        keep_alive_timeout: float = settings.CLIENT_KEEP_ALIVE_TIMEOUT,
+        retry_attempts: int = settings.CLIENT_RETRY_ATTEMPTS,
+        retry_base_delay: float = settings.CLIENT_RETRY_BASE_DELAY,
+        retry_max_delay: float = settings.CLIENT_RETRY_MAX_DELAY,
+        breaker_failure_threshold: int = settings.CLIENT_BREAKER_FAILURE_THRESHOLD,
+        breaker_recovery_timeout: float = settings.CLIENT_BREAKER_RECOVERY_TIMEOUT,
     ):
         """Init client"""
         self.server_host = server_host
         self.server_port = server_port
         self.server_path = f"http://{self.server_host}:{self.server_port}"  # noqa
+        self.request_timeout = request_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.connections_limit = connections_limit
+        self.keep_alive_timeout = keep_alive_timeout
+        self.retry_attempts = retry_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
         self.is_session_active = False
+        # HTTP session shared between all requests
+        self._session: ClientSession | None = None
+        # Stop hitting server while it keeps failing
+        self._breaker = CircuitBreaker(
+            failure_exceptions=FAILURE_ERRORS,
+            failure_threshold=breaker_failure_threshold,
+            recovery_timeout=breaker_recovery_timeout,
+        )
         # User data
-        self.user_token = None
+        self.user_token: str | None = None
         self.user_data = user_data
-
-    @property
-    def headers(self) -> dict[str, Any]:
-        """Get headers for request."""
-        if self.user_token:
-            return {
-                "Authorization": self.user_token,
-            }
-        return {}
+        # Headers for request, rebuilt only when token changes
+        self.headers: dict[str, str] = {}
+        # CLI command handlers
+        self._command_handlers: dict[str, Callable[[], Awaitable[None]]] = {
+            ClientCommandEnum.SEND.value: self._handle_send,
+            ClientCommandEnum.SEND_TO.value: self._handle_send_to,
+            ClientCommandEnum.STATUS.value: self.status,
+            ClientCommandEnum.MESSAGES.value: self._handle_messages,
+            ClientCommandEnum.CLOSE.value: self._handle_close,
+        }
 
     async def send(self, message: str) -> None:
         """Send message to main chat."""
-        endpoint = f"{self.server_path}/send/"
         try:
-            async with ClientSession() as session:
-                data = {
-                    "message": message,
-                }
-                async with session.post(
-                    url=endpoint,
-                    json=data,
-                    headers=self.headers,
-                ) as response:
-                    data = await response.json()
-                    logger.info(f"Request [{response.status}]: {data}")
-        except (ServerTimeoutError, ClientConnectorError) as e:
+            data = {
+                "message": message,
+            }
+            status, data = await self._request("POST", "/send/", json=data)
+            logger.info(f"Request [{status}]: {data}")
+        except CircuitOpenError as e:
+            logger.warning(e)
+        except REQUEST_ERRORS as e:
             logger.exception(e)
 
     async def send_to(self, login: str, message: str) -> None:
         """Send message to specific user."""
-        endpoint = f"{self.server_path}/send_to/"
         try:
-            async with ClientSession() as session:
-                data = {
-                    "user_login": login,
-                    "message": message,
-                }
-                async with session.post(
-                    url=endpoint,
-                    json=data,
-                    headers=self.headers,
-                ) as response:
-                    data = await response.json()
-                    logger.info(f"Request [{response.status}]: {data}")
-        except (ServerTimeoutError, ClientConnectorError) as e:
+            data = {
+                "user_login": login,
+                "message": message,
+            }
+            status, data = await self._request("POST", "/send_to/", json=data)
+            logger.info(f"Request [{status}]: {data}")
+        except CircuitOpenError as e:
+            logger.warning(e)
+        except REQUEST_ERRORS as e:
             logger.exception(e)
 
     async def status(self) -> None:
         """Get chat status."""
-        endpoint = f"{self.server_path}/status/"
         try:
-            async with ClientSession() as session:
-                async with session.get(
-                    url=endpoint,
-                    headers=self.headers,
-                ) as response:
-                    data = await response.json()
-                    logger.info(f"Request [{response.status}]: {data}")
-        except (ServerTimeoutError, ClientConnectorError) as e:
+            status, data = await self._request("GET", "/status/")
+            logger.info(f"Request [{status}]: {data}")
+        except CircuitOpenError as e:
+            logger.warning(e)
+        except REQUEST_ERRORS as e:
             logger.exception(e)
 
     async def messages(self, chat_name: str) -> None:
         """Get messages from chat."""
-        endpoint = f"{self.server_path}/chats/{chat_name}/messages/"
         try:
-            async with ClientSession() as session:
-                async with session.get(
-                    url=endpoint,
-                    headers=self.headers,
-                ) as response:
-                    data = await response.json()
-                    logger.info(f"Request [{response.status}]: {data}")
-        except (ServerTimeoutError, ClientConnectorError) as e:
+            status, data = await self._request("GET", f"/chats/{chat_name}/messages/")
+            logger.info(f"Request [{status}]: {data}")
+        except CircuitOpenError as e:
+            logger.warning(e)
+        except REQUEST_ERRORS as e:
             logger.exception(e)
 
     async def connect(self) -> None:
         """Connect to server"""
-        endpoint = f"{self.server_path}/connect/"
         self.is_session_active = True
         logger.info("Connecting to server...")
         try:
-            async with ClientSession() as session:
-                async with session.post(
-                    url=endpoint,
-                    json=self.user_data,
-                    headers=self.headers,
-                ) as response:
-                    data = await response.json()
-                    logger.info(f"Request [{response.status}]: {data}")
-                    # Save token
-                    self.user_token = data.get("token")
-        except (ServerTimeoutError, ClientConnectorError) as e:
+            status, data = await self._request("POST", "/connect/", json=self.user_data)
+            logger.info(f"Request [{status}]: {data}")
+            # Save token
+            self._set_token(data.get("token"))
+        except CircuitOpenError as e:
+            self.is_session_active = False
+            logger.warning(e)
+        except REQUEST_ERRORS as e:
             self.is_session_active = False
             logger.exception(e)
         logger.info("Connected to server")
 
     async def command_listener(self) -> None:
         """Listen for user commands"""
-        allowed_commands = ", ".join(ClientCommandEnum.get_cli_commands())
-        logger.info(f"Listening for CLI commands... ({allowed_commands})")
+        logger.info(f"Listening for CLI commands... ({ALLOWED_COMMANDS})")
         while self.is_session_active:
-            command = input("Enter command: ")
-            if command == ClientCommandEnum.SEND.value:
-                # Endpoint: /send/
-                message = input("Enter message: ")
-                await self.send(message=message)
-            if command == ClientCommandEnum.SEND_TO.value:
-                # Endpoint: /send_to/
-                login = input("Enter login: ")
-                message = input("Enter message: ")
-                await self.send_to(login=login, message=message)
-            elif command == ClientCommandEnum.STATUS.value:
-                # Endpoint: /status/
-                await self.status()
-            elif command == ClientCommandEnum.MESSAGES.value:
-                # Endpoint: /chats/{chat_name}/messages/
-                chat_name = input("Enter chat's name: ")
-                await self.messages(chat_name=chat_name)
-            elif command == ClientCommandEnum.CLOSE.value:
-                self.is_session_active = False
+            command = await _ainput("Enter command: ")
+            if handler := self._command_handlers.get(command):
+                await handler()
+            else:
+                logger.warning(f"Unknown command, allowed: {ALLOWED_COMMANDS}")
         logger.info("Stopped listening for CLI commands...")
 
+    async def aclose(self) -> None:
+        """Close HTTP session"""
+        if self._session:
+            await self._session.close()
+
     async def run(self):
         """Run client"""
-        await self.connect()
-        # listen CLI commands
-        await asyncio.gather(self.command_listener())
+        try:
+            await self.connect()
+            # listen CLI commands
+            await self.command_listener()
+        finally:
+            await self.aclose()
+
+    def _set_token(self, token: str | None) -> None:
+        """Save user token and headers for request."""
+        self.user_token = token
+        self.headers = {"Authorization": token} if token else {}
+
+    async def _get_session(self) -> ClientSession:
+        """Get HTTP session, create it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                json_serialize=lambda data: orjson.dumps(data).decode(),
+                base_url=self.server_path,
+                # Socket timeouts make aiohttp raise ServerTimeoutError
+                timeout=ClientTimeout(
+                    total=self.request_timeout,
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout,
+                ),
+                connector=TCPConnector(
+                    limit=self.connections_limit,
+                    keepalive_timeout=self.keep_alive_timeout,
+                ),
+            )
+        return self._session
+
+    async def _request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> tuple[int, dict[str, Any]]:
+        """Send request to server, retry if it is safe to repeat."""
+        async with self._breaker:
+            return await self._request_with_retry(method=method, url=url, **kwargs)
+
+    async def _request_with_retry(
+        self, method: str, url: str, **kwargs: Any
+    ) -> tuple[int, dict[str, Any]]:
+        """Send request to server with exponential backoff."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                session = await self._get_session()
+                async with session.request(
+                    method=method,
+                    url=url,
+                    headers=self.headers,
+                    **kwargs,
+                ) as response:
+                    return response.status, await response.json(loads=orjson.loads)
+            except ClientConnectionError as e:
+                if attempt >= self.retry_attempts or not _is_retryable(e, method):
+                    raise
+                # Exponential backoff with full jitter
+                delay = random.uniform(
+                    0, min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+                )
+                logger.warning(f"Request failed, retrying in {delay:.2f}s...")
+                await asyncio.sleep(delay)
+
+    async def _handle_send(self) -> None:
+        """Handle send command, endpoint: /send/"""
+        message = await _ainput("Enter message: ")
+        await self.send(message=message)
+
+    async def _handle_send_to(self) -> None:
+        """Handle send_to command, endpoint: /send_to/"""
+        login = await _ainput("Enter login: ")
+        message = await _ainput("Enter message: ")
+        await self.send_to(login=login, message=message)
+
+    async def _handle_messages(self) -> None:
+        """Handle messages command, endpoint: /chats/{chat_name}/messages/"""
+        chat_name = await _ainput("Enter chat's name: ")
+        await self.messages(chat_name=chat_name)
+
+    async def _handle_close(self) -> None:
+        """Handle close command."""
+        self.is_session_active = False
 
 
 if __name__ == "__main__":
@@ -13,3 +13,11 @@ class ClientCommandEnum(enum.Enum):
     @classmethod
     def get_cli_commands(cls) -> list[str]:
         return [command.value for command in cls]
+
+
+class CircuitBreakerStateEnum(enum.Enum):
+    """Circuit breaker states"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
@@ -1,19 +1,24 @@
+import bisect
+import itertools
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Optional
 
 from src.settings import settings
 
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-@dataclass
+
+@dataclass(slots=True)
 class RequestSchema:
-    headers: dict[str, Any]
+    token: str
     data: dict[str, Any]
     params: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     login: str
     password: str
@@ -22,16 +27,74 @@ class User:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     user: User
     text: str
     id: uuid.UUID = field(default_factory=uuid.uuid4)
     created_at: datetime = field(default_factory=lambda: datetime.now())
+    formatted_created_at: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Format creation time once for serialization."""
+        self.formatted_created_at = self.created_at.strftime(DATETIME_FORMAT)
 
 
-@dataclass
+@dataclass(slots=True)
 class Chat:
     name: str
     members: list[User] = field(default_factory=list)
-    messages: list[Message] = field(default_factory=list)
+    messages: deque[Message] = field(
+        default_factory=lambda: deque(maxlen=settings.MAX_CHAT_HISTORY),
+    )
+    member_logins: set[str] = field(default_factory=set, repr=False)
+    # Member logins in join order, ready for responses
+    member_login_list: list[str] = field(default_factory=list, repr=False)
+    # Creation time of each message, kept in lockstep with messages
+    created_ats: deque[datetime] = field(
+        default_factory=lambda: deque(maxlen=settings.MAX_CHAT_HISTORY),
+        repr=False,
+    )
+
+    def __post_init__(self):
+        """Index logins of initial members and message creation times."""
+        self.member_login_list.extend(member.login for member in self.members)
+        self.member_logins.update(self.member_login_list)
+        self.created_ats.extend(message.created_at for message in self.messages)
+
+    def add_member(self, user: User) -> None:
+        """Add user to chat members."""
+        self.members.append(user)
+        self.member_logins.add(user.login)
+        self.member_login_list.append(user.login)
+
+    def add_message(self, message: Message) -> None:
+        """Add message to chat history."""
+        self.messages.append(message)
+        self.created_ats.append(message.created_at)
+
+    def index_after(self, message: Message) -> int:
+        """Get index of the first message sent after the given one."""
+        index = bisect.bisect_left(self.created_ats, message.created_at)
+        stop = bisect.bisect_right(self.created_ats, message.created_at, lo=index)
+        # Find given message among messages created at the same time
+        for position in range(index, stop):
+            if self.messages[position] is message:
+                return position + 1
+        # Given message was evicted, every kept message from index is newer
+        return index
+
+    def get_messages(self, start: int, count: int) -> list[Message]:
+        """Get up to `count` messages from index, walking from the closer end."""
+        size = len(self.messages)
+        stop = min(start + count, size)
+        if start >= stop:
+            return []
+        if start <= size - stop:
+            return list(itertools.islice(self.messages, start, stop))
+        # Unseen messages are usually at the end of history
+        messages = list(
+            itertools.islice(reversed(self.messages), size - stop, size - start)
+        )
+        messages.reverse()
+        return messages
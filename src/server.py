@@ -1,15 +1,26 @@
 import asyncio
-import hashlib
 import http
-import json
 import logging
+import logging.handlers
+import queue
 import re
+import secrets
+import socket
 from typing import Any, Callable
 
+import orjson
+
 from src.models import Chat, Message, RequestSchema, User
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
+# Shared empty mapping for requests without params or body, must not be mutated
+EMPTY_DICT: dict[str, Any] = {}
+# Response head (status line with headers) and body
+Response = tuple[bytes, bytes]
+# Last response header, ends response head
+KEEP_ALIVE_HEADER = b"Connection: keep-alive\r\n\r\n"
+CLOSE_HEADER = b"Connection: close\r\n\r\n"
 
 
 class Server:
@@ -18,206 +29,260 @@ class Server:
         host: str | None = settings.SERVER_HOST,
         port: int = settings.SERVER_PORT,
         msg_batch_size: int = settings.MSG_BATCH_SIZE,
+        keep_alive_timeout: float = settings.SERVER_KEEP_ALIVE_TIMEOUT,
+        max_request_body_size: int = settings.MAX_REQUEST_BODY_SIZE,
     ):
         """Init server"""
         self.host = host
         self.port = port
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_request_body_size = max_request_body_size
         self.connected_users: dict[str, User] = {}
-        self.chats: list[Chat] = [Chat(name=settings.MAIN_CHAT_NAME)]  # type: ignore
+        # Chats by name, main chat is always first
+        self.chats: dict[str, Chat] = {
+            settings.MAIN_CHAT_NAME: Chat(name=settings.MAIN_CHAT_NAME)  # type: ignore
+        }
+        # Indexes for O(1) lookups
+        self._users_by_login: dict[str, User] = {}
+        self._token_by_credentials: dict[tuple[str, str], str] = {}
         self.status_code_map: dict[int, str] = {
             http.HTTPStatus.OK: "200 OK",
             http.HTTPStatus.BAD_REQUEST: "400 Bad Request",
             http.HTTPStatus.UNAUTHORIZED: "401 Unauthorized",
+            http.HTTPStatus.FORBIDDEN: "403 Forbidden",
             http.HTTPStatus.NOT_FOUND: "404 Not Found",
         }
-        self.endpoint_map = {
-            "POST/connect/": self.connect,
-            "POST/send/": self.send,
-            "POST/send_to/": self.send_to,
-            "GET/status/": self.status,
-            "GET/messages/": self.messages,
+        self._response_heads: dict[int, bytes] = {
+            code: (
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+            ).encode()
+            for code, status in self.status_code_map.items()
+        }
+        self.endpoint_map: dict[str, Callable[[RequestSchema], Response]] = {
+            "connect": self.connect,
+            "send": self.send,
+            "send_to": self.send_to,
+            "status": self.status,
+            "messages": self.messages,
+        }
+        # Method and path of endpoints, params are named groups
+        self.endpoint_routes: dict[str, tuple[str, str]] = {
+            "connect": ("POST", r"/connect/"),
+            "send": ("POST", r"/send/"),
+            "send_to": ("POST", r"/send_to/"),
+            "status": ("GET", r"/status/"),
+            "messages": ("GET", r"/chats/(?P<chat_name>[^/]+)/messages/"),
         }
-        self.endpoint_params_regex_map = {
-            "GET/messages/": {
-                "regex": r"/chats/([^/]+)/messages/",
-                "params": ["chat_name"],
-            },
+        self._route_params: dict[str, tuple[str, ...]] = {
+            name: tuple(re.compile(path).groupindex)
+            for name, (_, path) in self.endpoint_routes.items()
         }
+        # Routes without params are found by method, then by path
+        self._static_routes: dict[str, dict[str, Callable]] = {}
+        for name, (method, path) in self.endpoint_routes.items():
+            if not self._route_params[name]:
+                self._static_routes.setdefault(method, {})[path] = self.endpoint_map[
+                    name
+                ]
+        # Routes with params in one pattern, matched endpoint is the outer group
+        self._dynamic_router: re.Pattern[str] = re.compile(
+            "|".join(
+                f"(?P<{name}>{method} {path})"
+                for name, (method, path) in self.endpoint_routes.items()
+                if self._route_params[name]
+            )
+        )
         # Message batch size
         self.msg_batch_size = msg_batch_size
 
-    async def send_to(self, request: RequestSchema) -> str:
+    def send_to(self, request: RequestSchema) -> Response:
         """Send message to main chat."""
         # Get user token
-        user_token: str = request.headers.get("token")  # type: ignore
+        user_token: str = request.token
         # Get user data
         if sender_user := self.connected_users.get(user_token):
-            users: list[User] = [
-                user
-                for user in self.connected_users.values()
-                if user.login == request.data.get("user_login")
-            ]
-            if not users:
-                return await self._parse_response(
+            # Get receiver user
+            receiver_user = self._users_by_login.get(request.data.get("user_login"))  # type: ignore
+            if not receiver_user:
+                return self._parse_response(
                     http.HTTPStatus.NOT_FOUND, {"error": "User not found"}
                 )
-            # Get receiver user
-            receiver_user = users[0]
             # Add new message in main chat
             message = request.data.get("message")
-            chat = await self._get_or_create_chat(sender_user, receiver_user)
-            chat.messages.append(Message(user=sender_user, text=message))  # type: ignore
+            chat = self._get_or_create_chat(sender_user, receiver_user)
+            chat.add_message(Message(user=sender_user, text=message))  # type: ignore
             # Prepare response
-            return await self._parse_response(http.HTTPStatus.OK, {"message": message})
+            return self._parse_response(http.HTTPStatus.OK, {"message": message})
         # Return error
-        return await self._parse_response(
+        return self._parse_response(
             http.HTTPStatus.UNAUTHORIZED, {"error": "User not found"}
         )
 
-    async def send(self, request: RequestSchema) -> str:
+    def send(self, request: RequestSchema) -> Response:
         """Send message to main chat."""
         # Get user token
-        user_token: str = request.headers.get("token")  # type: ignore
+        user_token: str = request.token
         # Get user data
         if sender_user := self.connected_users.get(user_token):
             # Add new message in main chat
             message = request.data.get("message")
-            main_chat: Chat = await self._get_main_chat()
-            main_chat.messages.append(Message(user=sender_user, text=message))  # type: ignore
+            main_chat: Chat = self._get_main_chat()
+            main_chat.add_message(Message(user=sender_user, text=message))  # type: ignore
             # Prepare response
-            return await self._parse_response(http.HTTPStatus.OK, {"message": message})
+            return self._parse_response(http.HTTPStatus.OK, {"message": message})
         # Return error
-        return await self._parse_response(
+        return self._parse_response(
             http.HTTPStatus.UNAUTHORIZED, {"error": "User not found"}
         )
 
-    async def connect(self, request: RequestSchema) -> str:
+    def connect(self, request: RequestSchema) -> Response:
         """Connect user to chat."""
         # Get user token
-        user_token: str = request.headers.get("token")  # type: ignore
+        user_token: str = request.token
         # Check if user already connected
         if not self.connected_users.get(user_token):
-            user: User = User(**request.data)
-            new_user_token: str = await self.get_data_hash(user=user)
+            # Returning user keeps previously issued token
+            credentials = (request.data.get("login"), request.data.get("password"))
+            if not all(isinstance(value, str) for value in credentials):
+                return self._parse_response(
+                    http.HTTPStatus.BAD_REQUEST, {"error": "Invalid request"}
+                )
+            if new_user_token := self._token_by_credentials.get(credentials):  # type: ignore
+                return self._parse_response(
+                    http.HTTPStatus.OK, {"token": new_user_token}
+                )
+            # Login is taken, password doesn't match
+            if credentials[0] in self._users_by_login:
+                return self._parse_response(
+                    http.HTTPStatus.UNAUTHORIZED, {"error": "Invalid password"}
+                )
+            # Unknown body fields are ignored
+            user: User = User(login=credentials[0], password=credentials[1])  # type: ignore
+            new_user_token = self._new_token()
+            self._token_by_credentials[(user.login, user.password)] = new_user_token
             self.connected_users[new_user_token] = user
-            main_chat: Chat = await self._get_main_chat()
-            main_chat.members.append(user)
-            return await self._parse_response(
-                http.HTTPStatus.OK, {"token": new_user_token}
-            )
+            self._users_by_login[user.login] = user
+            main_chat: Chat = self._get_main_chat()
+            main_chat.add_member(user)
+            return self._parse_response(http.HTTPStatus.OK, {"token": new_user_token})
         # Return user token
-        return await self._parse_response(http.HTTPStatus.OK, {"token": user_token})
+        return self._parse_response(http.HTTPStatus.OK, {"token": user_token})
 
-    async def status(self, request: RequestSchema) -> str:
+    def status(self, request: RequestSchema) -> Response:
         """Get chat statuses for user."""
         # Get user token
-        user_token: str = request.headers.get("token")  # type: ignore
+        user_token: str = request.token
         # Get user data
         if user_data := self.connected_users.get(user_token):
             # Prepare user's chats
             response_data: dict[str, list[str]] = {}
-            for chat in self.chats:
-                member_logins: list[str] = [member.login for member in chat.members]
-                if user_data.login in member_logins:
-                    response_data[chat.name] = member_logins
+            for chat in self.chats.values():
+                if user_data.login in chat.member_logins:
+                    response_data[chat.name] = chat.member_login_list
             # Prepare response
-            return await self._parse_response(http.HTTPStatus.OK, response_data)
+            return self._parse_response(http.HTTPStatus.OK, response_data)
         # Return error
-        return await self._parse_response(
+        return self._parse_response(
             http.HTTPStatus.UNAUTHORIZED, {"error": "User not found"}
         )
 
-    async def messages(self, request: RequestSchema) -> str:
+    def messages(self, request: RequestSchema) -> Response:
         """Get messages for user."""
         # Get chat name
         chat_name: str = request.params.get("chat_name")  # type: ignore
         # Get user token
-        user_token: str = request.headers.get("token")  # type: ignore
+        user_token: str = request.token
         # Get user data
         user_data = self.connected_users.get(user_token)
+        if not user_data:
+            return self._parse_response(
+                http.HTTPStatus.UNAUTHORIZED, {"error": "User not found"}
+            )
         # Get chat
-        chat = await self._get_specific_chat(chat_name)
+        chat = self._get_specific_chat(chat_name)
         if not chat:
-            return await self._parse_response(
+            return self._parse_response(
                 http.HTTPStatus.NOT_FOUND, {"error": "Chat not found"}
             )
+        if user_data.login not in chat.member_logins:
+            return self._parse_response(
+                http.HTTPStatus.FORBIDDEN, {"error": "User is not a chat member"}
+            )
         # Get messages
-        if user_last_message := user_data.last_chat_message_map[chat_name]:  # type: ignore
-            messages = [
-                message
-                for number, message in enumerate(chat.messages)  # type: ignore
-                if all(
-                    (
-                        message.created_at > user_last_message.created_at,
-                        number < self.msg_batch_size,
-                    )
-                )
-            ]
+        if user_last_message := user_data.last_chat_message_map.get(chat_name):
+            # Messages are stored in creation order, find first unseen one
+            start = chat.index_after(user_last_message)
         else:
-            messages = chat.messages[: self.msg_batch_size]  # type: ignore
-            # Save last message
-            if messages:
-                user_data.last_chat_message_map[chat_name] = messages[-1]  # type: ignore
+            start = 0
+        messages = chat.get_messages(start=start, count=self.msg_batch_size)
+        # Save last message
+        if messages:
+            user_data.last_chat_message_map[chat_name] = messages[-1]
         # Prepare response
         response_data = {
             "messages": [
                 {
                     "user": message.user.login,
                     "text": message.text,
-                    "created_at": message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    "created_at": message.formatted_created_at,
                 }
                 for message in messages
             ]
         }
-        return await self._parse_response(http.HTTPStatus.OK, response_data)
+        return self._parse_response(http.HTTPStatus.OK, response_data)
 
     async def handle_request(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ):
-        """Handle user's request."""
+        """Handle user's connection, serve requests while it is kept alive."""
         address = writer.get_extra_info("peername")
-        logger.info("======================================")
-        logger.info(f"Start serving {address}")
+        logger.debug("Start serving %s", address)
+        self._tune_socket(writer=writer)
 
-        # Get endpoint
-        method, target_endpoint, params = await self._get_target_endpoint(reader=reader)
-        if target_endpoint:
-            # Get headers
-            headers: dict[str, str] = await self._parse_headers(reader=reader)
-            content_length: int = int(headers.get("Content-Length", 0))
-            user_token: str | None = headers.get("Authorization", None)
-            # Check that content length is not None
-            if method == "GET" or content_length:
-                # Call endpoint
-                body = await self._parse_request_body(
-                    reader=reader, content_length=content_length
-                )
-                request: RequestSchema = RequestSchema(
-                    headers={"token": user_token},
-                    data=body,
-                    params=params,
+        keep_alive = True
+        try:
+            while keep_alive:
+                # Get request line and headers
+                try:
+                    method, path, protocol, headers = await asyncio.wait_for(
+                        self._parse_head(reader=reader),
+                        timeout=self.keep_alive_timeout,
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    # Client closed connection or stayed idle for too long
+                    break
+                except (asyncio.LimitOverrunError, ValueError):
+                    # Request head is too large or malformed, stream can't be reused
+                    await self._reject_request(writer=writer)
+                    break
+                try:
+                    content_length = self._get_content_length(headers=headers)
+                except ValueError:
+                    # Body end is unknown or body is too large, stream can't be reused
+                    await self._reject_request(writer=writer)
+                    break
+                keep_alive = self._is_keep_alive(protocol=protocol, headers=headers)
+                # Body is always read so next request on connection starts clean
+                try:
+                    raw_body = await self._read_body(
+                        reader=reader, content_length=content_length
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    # Client closed connection or stalled in the middle of body
+                    break
+                response = self._handle_single_request(
+                    method=method, path=path, headers=headers, raw_body=raw_body
                 )
-                response: str = await target_endpoint(request)
-            else:
-                # Raise bad request data
-                response = await self._parse_response(
-                    http.HTTPStatus.BAD_REQUEST, {"error": "Invalid request"}
+                # Send response
+                self._write_response(
+                    writer=writer, response=response, keep_alive=keep_alive
                 )
-        else:
-            # Raise not found endpoint
-            response = await self._parse_response(
-                http.HTTPStatus.NOT_FOUND, {"error": "Endpoint not found"}
-            )
-        # Send response
-        logger.info("============== RESPONSE ==============")
-        logger.info(f"Response: {response}")
-        logger.info("======================================")
-        writer.write(response.encode())
-        await writer.drain()
-        # Close connection
-        logger.info(f"Stop serving {address}")
-        logger.info("======================================")
-        writer.close()
+                await writer.drain()
+        finally:
+            # Close connection
+            logger.debug("Stop serving %s", address)
+            writer.close()
 
     async def run(self):
         """Run server."""
@@ -227,19 +292,18 @@ class Server:
             port=self.port,
         )
         async with srv:
-            logger.info(f"Server started at {self.host}:{self.port}")
+            logger.info("Server started at %s:%s", self.host, self.port)
             await srv.serve_forever()
 
-    async def _get_specific_chat(self, chat_name: str) -> Chat | None:
+    def _get_specific_chat(self, chat_name: str) -> Chat | None:
         """Get specific chat."""
-        chat = [chat for chat in self.chats if chat.name == chat_name]
-        return chat[0] if chat else None
+        return self.chats.get(chat_name)
 
-    async def _get_main_chat(self) -> Chat:
+    def _get_main_chat(self) -> Chat:
         """Get main chat."""
-        return self.chats[0]
+        return self.chats[settings.MAIN_CHAT_NAME]  # type: ignore
 
-    async def _get_or_create_chat(self, sender_user: User, receiver_user: User) -> Chat:
+    def _get_or_create_chat(self, sender_user: User, receiver_user: User) -> Chat:
         """Get or create chat."""
         members = [sender_user, receiver_user]
         chat_name: str = "+".join(
@@ -248,83 +312,192 @@ class Server:
                 for member in sorted(members, key=lambda member: member.login)
             ]
         )
-        chats: list[Chat] = [chat for chat in self.chats if chat.name == chat_name]
-        if chats:
+        if chat := self.chats.get(chat_name):
             # Return existing chat
-            return chats[0]
+            return chat
         # Create new chat
         new_chat = Chat(name=chat_name, members=members)
-        self.chats.append(new_chat)
+        self.chats[chat_name] = new_chat
         # Save chat in last message map
         sender_user.last_chat_message_map[chat_name] = None
         receiver_user.last_chat_message_map[chat_name] = None
         return new_chat
 
-    async def _parse_response(self, code: int, data: dict[str, Any]) -> str:
-        """Parse response data to string."""
-        response = f"HTTP/1.1 {self.status_code_map.get(code)}\r\n"
-        response += "Content-Type: application/json; charset=utf-8\r\n"
-        response += "\r\n"
-        response += json.dumps(data)
-        return response
-
-    async def _get_target_endpoint(
-        self, reader: asyncio.StreamReader
-    ) -> tuple[str, Callable | None, dict]:
-        """Get target endpoint from request line."""
-        # Get request line
-        request_line = await reader.readline()
-        method, path, protocol = request_line.decode().strip().split(" ")
-        logger.info(f"{method}: {self.host}:{self.port}{path}")
-        # Get endpoint key
-        path_parts = path.split("/")
-        endpoint_key = f"{method}/{path_parts[-2]}/"
-        # Get params
-        params = (
-            await self._parse_params(path=path, endpoint_key=endpoint_key)
-            if len(path_parts) > 2
-            else {}
+    def _handle_single_request(
+        self, method: str, path: str, headers: dict[str, str], raw_body: bytes
+    ) -> Response:
+        """Call target endpoint with already read request body."""
+        # Get endpoint
+        target_endpoint, params = self._get_target_endpoint(method=method, path=path)
+        if not target_endpoint:
+            # Raise not found endpoint
+            return self._parse_response(
+                http.HTTPStatus.NOT_FOUND, {"error": "Endpoint not found"}
+            )
+        # Check that content length is not None
+        if method != "GET" and not raw_body:
+            # Raise bad request data
+            return self._parse_response(
+                http.HTTPStatus.BAD_REQUEST, {"error": "Invalid request"}
+            )
+        try:
+            body = self._parse_request_body(raw_body=raw_body)
+        except ValueError:
+            return self._parse_response(
+                http.HTTPStatus.BAD_REQUEST, {"error": "Invalid request"}
+            )
+        # Call endpoint
+        request: RequestSchema = RequestSchema(
+            token=headers.get("authorization", ""),
+            data=body,
+            params=params,
         )
+        return target_endpoint(request)
+
+    def _parse_response(self, code: int, data: dict[str, Any]) -> Response:
+        """Parse response data to bytes."""
+        return self._response_heads[code], orjson.dumps(data)
+
+    def _get_target_endpoint(
+        self, method: str, path: str
+    ) -> tuple[Callable | None, dict[str, Any]]:
+        """Get target endpoint from request method and path."""
+        logger.debug("%s: %s:%s%s", method, self.host, self.port, path)
+        # Drop query string
+        if "?" in path:
+            path, _, _ = path.partition("?")
+        if endpoint := self._static_routes.get(method, EMPTY_DICT).get(path):
+            return endpoint, EMPTY_DICT
+        match = self._dynamic_router.fullmatch(f"{method} {path}")
+        if match is None:
+            return None, EMPTY_DICT
+        endpoint_name: str = match.lastgroup  # type: ignore
+        # Get params
+        params = {param: match[param] for param in self._route_params[endpoint_name]}
         # Return endpoint
-        return method, self.endpoint_map.get(endpoint_key), params
-
-    async def _parse_params(self, path: str, endpoint_key: str) -> dict[str, Any]:
-        """Parse params from path."""
-        if params_regex := self.endpoint_params_regex_map.get(endpoint_key):
-            match = re.match(params_regex.get("regex", ""), path)  # type: ignore
-            return {
-                param_name: match.group(number)
-                for number, param_name in enumerate(params_regex.get("params"), start=1)  # type: ignore
-            }
-        return {}
+        return self.endpoint_map[endpoint_name], params or EMPTY_DICT
+
+    def _get_content_length(self, headers: dict[str, str]) -> int:
+        """Get request body length, raise ValueError if body framing is invalid."""
+        if "transfer-encoding" in headers:
+            # Only Content-Length framing is supported
+            raise ValueError("Transfer-Encoding is not supported")
+        value = headers.get("content-length", "0")
+        # int() also accepts signs, spaces and underscores, body length can't have them
+        if not (value.isascii() and value.isdigit()):
+            raise ValueError(f"Invalid Content-Length: {value!r}")
+        content_length = int(value)
+        if content_length > self.max_request_body_size:
+            raise ValueError(f"Request body is too large: {content_length}")
+        return content_length
+
+    async def _read_body(
+        self, reader: asyncio.StreamReader, content_length: int
+    ) -> bytes:
+        """Read request body, wait for it no longer than keep-alive timeout."""
+        if not content_length:
+            # Nothing to wait for, skip creating timeout task
+            return b""
+        return await asyncio.wait_for(
+            reader.readexactly(content_length), timeout=self.keep_alive_timeout
+        )
+
+    async def _reject_request(self, writer: asyncio.StreamWriter) -> None:
+        """Answer unparsable request, connection must be closed after it."""
+        response = self._parse_response(
+            http.HTTPStatus.BAD_REQUEST, {"error": "Invalid request"}
+        )
+        self._write_response(writer=writer, response=response, keep_alive=False)
+        await writer.drain()
+
+    @staticmethod
+    def _parse_request_body(raw_body: bytes) -> dict:
+        """Parse request body, raise ValueError if it is not JSON object."""
+        body = orjson.loads(raw_body) if raw_body else EMPTY_DICT
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be JSON object")
+        return body
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter, response: Response, keep_alive: bool
+    ) -> None:
+        """Write response to connection buffer."""
+        logger.debug("Response: %s", response)
+        head, body = response
+        writer.writelines(
+            (
+                head,
+                b"Content-Length: %d\r\n" % len(body),
+                KEEP_ALIVE_HEADER if keep_alive else CLOSE_HEADER,
+                body,
+            )
+        )
+
+    @staticmethod
+    def _tune_socket(writer: asyncio.StreamWriter) -> None:
+        """Detect dead idle peers on kept alive connections."""
+        sock = writer.get_extra_info("socket")
+        if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
     @staticmethod
-    async def _parse_request_body(
-        reader: asyncio.StreamReader, content_length: int
-    ) -> dict:
-        """Parse request body."""
-        body = await reader.read(content_length)
-        return json.loads(body.decode()) if body else {}
+    def _is_keep_alive(protocol: str, headers: dict[str, str]) -> bool:
+        """Check if connection should stay open after response."""
+        connection = headers.get("connection", "").lower()
+        if protocol == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
 
     @staticmethod
-    async def _parse_headers(reader: asyncio.StreamReader) -> dict[str, str]:
-        """Parse request headers."""
+    async def _parse_head(
+        reader: asyncio.StreamReader,
+    ) -> tuple[str, str, str, dict[str, str]]:
+        """Parse request line and headers."""
+        # Read whole head at once, it ends with an empty line
+        head = await reader.readuntil(b"\r\n\r\n")
+        # Decode once, per-line decoding costs more than it saves
+        request_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+        method, path, protocol = request_line.split(" ")
         headers: dict[str, str] = {}
-        while True:
-            header = await reader.readline()
-            if header == b"\r\n":
-                break
-            key, value = header.decode().strip().split(": ")
-            headers[key] = value
-        return headers
+        for header in header_lines:
+            key, _, value = header.partition(":")
+            # Header names are case-insensitive, keep them lowercase
+            key = key.lower()
+            if key == "content-length" and key in headers:
+                # Repeated body length makes request framing ambiguous
+                raise ValueError("Duplicate Content-Length header")
+            headers[key] = value.strip()
+        return method, path, protocol, headers
 
     @staticmethod
-    async def get_data_hash(user: User) -> str:
-        """Get user data hash."""
-        return hashlib.sha256(f"{user.login}{user.password}".encode()).hexdigest()
+    def _new_token() -> str:
+        """Get new random session token, 128 bits are enough for session id."""
+        return secrets.token_hex(16)
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Write server logs from a background thread, listener must be started."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    return logging.handlers.QueueListener(log_queue, logging.StreamHandler())
 
 
 if __name__ == "__main__":
     """Run server."""
+    log_listener = setup_logging()
+    log_listener.start()
+    try:
+        import uvloop  # type: ignore[import]
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        logger.info("uvloop is not installed, using default event loop")
     server = Server()
-    asyncio.run(server.run())
+    try:
+        asyncio.run(server.run())
+    finally:
+        log_listener.stop()
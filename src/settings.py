@@ -6,8 +6,23 @@ class AppSettings(BaseSettings):
 
     SERVER_HOST: str = Field(default="localhost")
     SERVER_PORT: int = Field(default=8000)
+    SERVER_KEEP_ALIVE_TIMEOUT: float = Field(default=75)
     MSG_BATCH_SIZE: int = Field(default=20)
+    MAX_CHAT_HISTORY: int = Field(default=10_000)
+    MAX_REQUEST_BODY_SIZE: int = Field(default=65_536)
     MAIN_CHAT_NAME: str = Field(default="main")
+    LOG_LEVEL: str = Field(default="INFO")
+    CLIENT_REQUEST_TIMEOUT: int = Field(default=10)
+    CLIENT_CONNECT_TIMEOUT: float = Field(default=3)
+    CLIENT_READ_TIMEOUT: float = Field(default=5)
+    CLIENT_CONNECTIONS_LIMIT: int = Field(default=10)
+    # Must be lower than SERVER_KEEP_ALIVE_TIMEOUT
+    CLIENT_KEEP_ALIVE_TIMEOUT: float = Field(default=30)
+    CLIENT_RETRY_ATTEMPTS: int = Field(default=4)
+    CLIENT_RETRY_BASE_DELAY: float = Field(default=0.1)
+    CLIENT_RETRY_MAX_DELAY: float = Field(default=2.0)
+    CLIENT_BREAKER_FAILURE_THRESHOLD: int = Field(default=5)
+    CLIENT_BREAKER_RECOVERY_TIMEOUT: float = Field(default=30)
 
     class Config:
         env_file = "../.env"
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from src import circuit_breaker
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.enums import CircuitBreakerStateEnum
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+async def call(breaker: CircuitBreaker, error: BaseException | None = None) -> None:
+    async with breaker:
+        if error is not None:
+            raise error
+
+
+def run_call(breaker: CircuitBreaker, error: BaseException | None = None) -> None:
+    asyncio.run(call(breaker, error))
+
+
+def test_breaker_full_cycle(clock):
+    breaker = CircuitBreaker(
+        failure_exceptions=(ConnectionError,), failure_threshold=2, recovery_timeout=10
+    )
+    # Failures below threshold keep circuit closed
+    with pytest.raises(ConnectionError):
+        run_call(breaker, ConnectionError())
+    assert breaker.state == CircuitBreakerStateEnum.CLOSED
+    # Threshold reached, circuit opens
+    with pytest.raises(ConnectionError):
+        run_call(breaker, ConnectionError())
+    assert breaker.state == CircuitBreakerStateEnum.OPEN
+    # Requests are rejected until recovery timeout passes
+    clock.now = 9.9
+    with pytest.raises(CircuitOpenError):
+        run_call(breaker)
+    # Trial request succeeds and closes circuit
+    clock.now = 10
+    run_call(breaker)
+    assert breaker.state == CircuitBreakerStateEnum.CLOSED
+
+
+def test_breaker_reopens_on_failed_trial(clock):
+    breaker = CircuitBreaker(
+        failure_exceptions=(ConnectionError,), failure_threshold=1, recovery_timeout=10
+    )
+    with pytest.raises(ConnectionError):
+        run_call(breaker, ConnectionError())
+    clock.now = 10
+    with pytest.raises(ConnectionError):
+        run_call(breaker, ConnectionError())
+    assert breaker.state == CircuitBreakerStateEnum.OPEN
+    # Recovery timeout starts over
+    clock.now = 15
+    with pytest.raises(CircuitOpenError):
+        run_call(breaker)
+
+
+def test_breaker_limits_half_open_calls(clock):
+    breaker = CircuitBreaker(
+        failure_exceptions=(ConnectionError,), failure_threshold=1, recovery_timeout=10
+    )
+    with pytest.raises(ConnectionError):
+        run_call(breaker, ConnectionError())
+    clock.now = 10
+
+    async def concurrent_calls() -> None:
+        trial_started = asyncio.Event()
+
+        async def trial() -> None:
+            async with breaker:
+                trial_started.set()
+                await asyncio.sleep(0)
+
+        trial_task = asyncio.create_task(trial())
+        await trial_started.wait()
+        assert breaker.state == CircuitBreakerStateEnum.HALF_OPEN
+        # Second request while trial is in flight is rejected
+        with pytest.raises(CircuitOpenError):
+            await call(breaker)
+        await trial_task
+
+    asyncio.run(concurrent_calls())
+    assert breaker.state == CircuitBreakerStateEnum.CLOSED
+
+
+def test_breaker_ignores_unrelated_errors(clock):
+    breaker = CircuitBreaker(failure_exceptions=(ConnectionError,), failure_threshold=1)
+    with pytest.raises(KeyError):
+        run_call(breaker, KeyError())
+    assert breaker.state == CircuitBreakerStateEnum.CLOSED
@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+from typing import Any
+
+import pytest
+from aiohttp.client_exceptions import (
+    ClientConnectorError,
+    ServerDisconnectedError,
+    ServerTimeoutError,
+)
+
+from src.client import Client, _ainput
+from src.enums import CircuitBreakerStateEnum
+
+
+class FakeResponse:
+    status = 200
+
+    async def json(self, loads: Any) -> dict[str, Any]:
+        return {"ok": True}
+
+
+class FakeSession:
+    """Session that raises given errors before answering."""
+
+    def __init__(self, errors: list[BaseException]):
+        self.errors = errors
+        self.calls = 0
+
+    @contextlib.asynccontextmanager
+    async def request(self, **kwargs: Any):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        yield FakeResponse()
+
+
+def connection_error() -> ClientConnectorError:
+    return ClientConnectorError(connection_key=None, os_error=OSError("refused"))
+
+
+def connect_timeout() -> ServerTimeoutError:
+    """Build error the way aiohttp raises it for connect timeout."""
+    error = ServerTimeoutError("Connection timeout")
+    error.__cause__ = asyncio.TimeoutError()
+    return error
+
+
+def make_client(
+    session: FakeSession, retry_attempts: int = 3, breaker_failure_threshold: int = 100
+) -> Client:
+    client = Client(
+        user_data={},
+        retry_attempts=retry_attempts,
+        retry_base_delay=0,
+        breaker_failure_threshold=breaker_failure_threshold,
+    )
+
+    async def get_session() -> FakeSession:
+        return session
+
+    client._get_session = get_session  # type: ignore
+    return client
+
+
+def test_retry_connection_error_until_success():
+    session = FakeSession(errors=[connection_error(), connection_error()])
+    client = make_client(session)
+    assert asyncio.run(client._request("POST", "/send/")) == (200, {"ok": True})
+    assert session.calls == 3
+
+
+def test_retry_gives_up_after_attempts():
+    session = FakeSession(errors=[connection_error() for _ in range(5)])
+    client = make_client(session)
+    with pytest.raises(ClientConnectorError):
+        asyncio.run(client._request("GET", "/status/"))
+    assert session.calls == 3
+
+
+def test_read_timeout_is_not_retried_for_post():
+    session = FakeSession(errors=[ServerTimeoutError()])
+    client = make_client(session)
+    with pytest.raises(ServerTimeoutError):
+        asyncio.run(client._request("POST", "/send/"))
+    assert session.calls == 1
+
+
+def test_read_timeout_is_retried_for_get():
+    session = FakeSession(errors=[ServerTimeoutError()])
+    client = make_client(session)
+    assert asyncio.run(client._request("GET", "/status/")) == (200, {"ok": True})
+    assert session.calls == 2
+
+
+def test_connect_timeout_is_retried_for_post():
+    session = FakeSession(errors=[connect_timeout()])
+    client = make_client(session)
+    assert asyncio.run(client._request("POST", "/send/")) == (200, {"ok": True})
+    assert session.calls == 2
+
+
+@pytest.mark.parametrize("method, calls", [("GET", 2), ("POST", 1)])
+def test_server_disconnect_is_retried_only_for_get(method, calls):
+    session = FakeSession(errors=[ServerDisconnectedError(), ServerDisconnectedError()])
+    client = make_client(session, retry_attempts=2)
+    with pytest.raises(ServerDisconnectedError):
+        asyncio.run(client._request(method, "/status/"))
+    assert session.calls == calls
+
+
+def test_server_disconnect_opens_circuit():
+    session = FakeSession(errors=[ServerDisconnectedError()])
+    client = make_client(session, breaker_failure_threshold=1)
+    asyncio.run(client.send("hello"))
+    assert client._breaker.state == CircuitBreakerStateEnum.OPEN
+
+
+def test_read_timeout_on_real_socket():
+    connections = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        nonlocal connections
+        connections += 1
+        # Read request and never answer
+        await reader.readuntil(b"\r\n\r\n")
+        await asyncio.sleep(5)
+        writer.close()
+
+    async def main() -> None:
+        srv = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            client = Client(
+                user_data={},
+                server_host="127.0.0.1",
+                server_port=port,
+                read_timeout=0.2,
+                retry_attempts=2,
+                retry_base_delay=0,
+            )
+            try:
+                with pytest.raises(ServerTimeoutError):
+                    await client._request("GET", "/status/")
+                with pytest.raises(ServerTimeoutError):
+                    await client._request("POST", "/send/", json={"message": "hi"})
+            finally:
+                await client.aclose()
+
+    asyncio.run(main())
+    # GET was sent twice, POST once
+    assert connections == 3
+
+
+def test_ainput_reads_line(monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: f"{prompt}hello")
+    assert asyncio.run(_ainput("> ")) == "> hello"
+
+
+def test_ainput_passes_eof(monkeypatch):
+    def closed_stdin(prompt: str) -> str:
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", closed_stdin)
+    with pytest.raises(EOFError):
+        asyncio.run(_ainput())
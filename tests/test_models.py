@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models import Chat, Message, User
+from src.settings import settings
+
+START = datetime(2023, 4, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def user() -> User:
+    return User(login="alice", password="secret")
+
+
+def make_chat(user: User, offsets: list[int]) -> tuple[Chat, list[Message]]:
+    """Create chat with messages sent `offsets` seconds after start."""
+    chat = Chat(name="main")
+    messages = [
+        Message(user=user, text=str(i), created_at=START + timedelta(seconds=offset))
+        for i, offset in enumerate(offsets)
+    ]
+    for message in messages:
+        chat.add_message(message)
+    return chat, messages
+
+
+def test_index_after_distinct_timestamps(user):
+    chat, messages = make_chat(user, [0, 1, 2, 3])
+    assert chat.index_after(messages[0]) == 1
+    assert chat.index_after(messages[3]) == 4
+
+
+def test_index_after_same_timestamp_run(user):
+    chat, messages = make_chat(user, [0, 1, 1, 1, 2])
+    assert chat.index_after(messages[1]) == 2
+    assert chat.index_after(messages[2]) == 3
+    assert chat.index_after(messages[3]) == 4
+
+
+def test_index_after_evicted_message(monkeypatch, user):
+    monkeypatch.setattr(settings, "MAX_CHAT_HISTORY", 3)
+    chat, messages = make_chat(user, [0, 1, 2, 3, 4])
+    # Messages 0 and 1 are evicted, everything kept is unseen
+    assert list(chat.messages) == messages[2:]
+    assert chat.index_after(messages[0]) == 0
+    assert chat.index_after(messages[1]) == 0
+    assert chat.index_after(messages[2]) == 1
+
+
+def test_index_after_evicted_message_in_same_timestamp_run(monkeypatch, user):
+    monkeypatch.setattr(settings, "MAX_CHAT_HISTORY", 2)
+    chat, messages = make_chat(user, [1, 1, 1])
+    # Message 0 is evicted, kept messages with the same time are unseen
+    assert chat.index_after(messages[0]) == 0
+    assert chat.index_after(messages[1]) == 1
+
+
+def test_get_messages_from_front(user):
+    chat, messages = make_chat(user, list(range(10)))
+    assert chat.get_messages(start=1, count=3) == messages[1:4]
+
+
+def test_get_messages_from_back(user):
+    chat, messages = make_chat(user, list(range(10)))
+    assert chat.get_messages(start=7, count=2) == messages[7:9]
+    # Batch is cut at the end of history
+    assert chat.get_messages(start=8, count=5) == messages[8:]
+
+
+def test_get_messages_out_of_range(user):
+    chat, _ = make_chat(user, list(range(3)))
+    assert chat.get_messages(start=3, count=5) == []
+    assert chat.get_messages(start=0, count=0) == []
@@ -0,0 +1,190 @@
+import asyncio
+
+import orjson
+import pytest
+
+from src.models import RequestSchema
+from src.server import Server
+
+CONNECT_BODY = orjson.dumps({"login": "alice", "password": "secret"})
+
+
+def exchange(raw: bytes, **server_kwargs) -> bytes:
+    """Send raw bytes to server, return everything it writes until close."""
+
+    async def main() -> bytes:
+        server = Server(host="127.0.0.1", keep_alive_timeout=0.5, **server_kwargs)
+        srv = await asyncio.start_server(server.handle_request, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(raw)
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+            await writer.wait_closed()
+            return data
+
+    return asyncio.run(main())
+
+
+def split_responses(data: bytes) -> list[tuple[bytes, bytes]]:
+    """Split stream into (status line with headers, body) pairs."""
+    responses = []
+    while data:
+        head, data = data.split(b"\r\n\r\n", 1)
+        length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        responses.append((head, data[:length]))
+        data = data[length:]
+    return responses
+
+
+def test_keep_alive_serves_several_requests():
+    raw = (
+        b"POST /connect/ HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(CONNECT_BODY)
+        + CONNECT_BODY
+        + b"GET /status/ HTTP/1.1\r\nConnection: close\r\n\r\n"
+    )
+    (first_head, _), (second_head, _) = split_responses(exchange(raw))
+    assert first_head.startswith(b"HTTP/1.1 200 OK")
+    assert first_head.endswith(b"Connection: keep-alive")
+    # No token was sent
+    assert second_head.startswith(b"HTTP/1.1 401 Unauthorized")
+    assert second_head.endswith(b"Connection: close")
+
+
+def test_http_1_0_closes_by_default():
+    raw = b"GET /status/ HTTP/1.0\r\n\r\nGET /status/ HTTP/1.0\r\n\r\n"
+    responses = split_responses(exchange(raw))
+    assert len(responses) == 1
+    assert responses[0][0].endswith(b"Connection: close")
+
+
+def test_lowercase_header_names():
+    raw = (
+        b"POST /connect/ HTTP/1.1\r\ncontent-length: %d\r\nconnection: close\r\n\r\n"
+        % len(CONNECT_BODY)
+        + CONNECT_BODY
+    )
+    [(head, body)] = split_responses(exchange(raw))
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert "token" in orjson.loads(body)
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        b"Transfer-Encoding: chunked\r\n",
+        b"Content-Length: abc\r\n",
+        b"Content-Length: -5\r\n",
+        b"Content-Length: +5\r\n",
+        b"Content-Length: 1\r\nContent-Length: 2\r\n",
+        b"Content-Length: 1025\r\n",
+    ],
+)
+def test_invalid_body_framing_is_rejected(headers):
+    raw = b"POST /connect/ HTTP/1.1\r\n" + headers + b"\r\n" + CONNECT_BODY
+    [(head, _)] = split_responses(exchange(raw, max_request_body_size=1024))
+    assert head.startswith(b"HTTP/1.1 400 Bad Request")
+    assert head.endswith(b"Connection: close")
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"GARBAGE\r\n\r\n",
+        b"GET /status/ HTTP/1.1 extra\r\n\r\n",
+        b"GET /" + b"a" * 2**17 + b" HTTP/1.1\r\n\r\n",
+    ],
+)
+def test_malformed_head_is_rejected(raw):
+    [(head, _)] = split_responses(exchange(raw))
+    assert head.startswith(b"HTTP/1.1 400 Bad Request")
+    assert head.endswith(b"Connection: close")
+
+
+def test_truncated_body_closes_connection():
+    raw = b"POST /connect/ HTTP/1.1\r\nContent-Length: 100\r\n\r\n{"
+    assert exchange(raw) == b""
+
+
+def test_invalid_json_body():
+    raw = b"POST /connect/ HTTP/1.1\r\nContent-Length: 1\r\nConnection: close\r\n\r\n{"
+    [(head, _)] = split_responses(exchange(raw))
+    assert head.startswith(b"HTTP/1.1 400 Bad Request")
+
+
+def test_connect_with_non_string_login():
+    body = orjson.dumps({"login": ["alice"], "password": "secret"})
+    raw = (
+        b"POST /connect/ HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+        % len(body)
+        + body
+    )
+    [(head, _)] = split_responses(exchange(raw))
+    assert head.startswith(b"HTTP/1.1 400 Bad Request")
+
+
+@pytest.mark.parametrize("body", [b"[1]", b'"text"', b"1", b"null"])
+def test_non_object_json_body(body):
+    raw = (
+        b"POST /connect/ HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body)
+        + body
+        + b"GET /status/ HTTP/1.1\r\nConnection: close\r\n\r\n"
+    )
+    (first_head, _), (second_head, _) = split_responses(exchange(raw))
+    assert first_head.startswith(b"HTTP/1.1 400 Bad Request")
+    # Connection is still usable
+    assert second_head.startswith(b"HTTP/1.1 401 Unauthorized")
+
+
+def test_connect_ignores_unknown_fields():
+    body = orjson.dumps({"login": "alice", "password": "secret", "admin": True})
+    raw = (
+        b"POST /connect/ HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+        % len(body)
+        + body
+    )
+    [(head, _)] = split_responses(exchange(raw))
+    assert head.startswith(b"HTTP/1.1 200 OK")
+
+
+def test_messages_without_token():
+    raw = b"GET /chats/main/messages/ HTTP/1.1\r\nConnection: close\r\n\r\n"
+    [(head, _)] = split_responses(exchange(raw))
+    assert head.startswith(b"HTTP/1.1 401 Unauthorized")
+
+
+def test_messages_of_foreign_chat():
+    server = Server()
+    tokens = {}
+    for login in ("alice", "bob", "carol"):
+        request = RequestSchema(token="", data={"login": login, "password": "p"})
+        tokens[login] = orjson.loads(server.connect(request)[1])["token"]
+    server.send_to(
+        RequestSchema(
+            token=tokens["alice"], data={"user_login": "bob", "message": "psst"}
+        )
+    )
+    head, _ = server.messages(
+        RequestSchema(token=tokens["carol"], data={}, params={"chat_name": "alice+bob"})
+    )
+    assert head.startswith(b"HTTP/1.1 403 Forbidden")
+    head, body = server.messages(
+        RequestSchema(token=tokens["bob"], data={}, params={"chat_name": "alice+bob"})
+    )
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert [message["text"] for message in orjson.loads(body)["messages"]] == ["psst"]
+
+
+def test_connect_with_taken_login():
+    server = Server()
+    request = RequestSchema(token="", data={"login": "alice", "password": "p"})
+    token = orjson.loads(server.connect(request)[1])["token"]
+    # Returning user gets the same token
+    assert orjson.loads(server.connect(request)[1])["token"] == token
+    head, _ = server.connect(
+        RequestSchema(token="", data={"login": "alice", "password": "other"})
+    )
+    assert head.startswith(b"HTTP/1.1 401 Unauthorized")
+    assert server._get_main_chat().member_login_list == ["alice"]